@@ -2,24 +2,23 @@ import streamlit as st
 import pandas as pd
 from typing import Dict, Optional
 from pathlib import Path
-import sys, os, json
+import sys, os, json, hashlib, tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Ensure parent directory (package root) is on sys.path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Local imports
-from core.providers.sqlite_provider import SQLiteProvider
-from core.providers.postgres_provider import PostgresProvider
-from core.providers.mysql_provider import MySQLProvider
-from core.providers.redshift_provider import RedshiftProvider
-from core.providers.bigquery_provider import BigQueryProvider
-from core.providers.snowflake_provider import SnowflakeProvider
-from core.providers.s3_provider import S3Provider
+# Local imports (provider modules are imported lazily in make_provider, since their SDKs are slow to load)
 from core.migration import migrate_table, check_table_quality, apply_corrections, add_data_from_dataframe
 
 
 st.set_page_config(page_title="DeltaGuard", page_icon="🛡️", layout="wide")
 
+# Service-account keys uploaded in the BigQuery forms are kept here, outside the working directory
+KEYFILE_DIR = Path(tempfile.gettempdir()) / "deltaguard_keys"
+
 
 def provider_selector(label: str) -> str:
     options = [
@@ -69,7 +68,12 @@ def render_credentials_form(provider_name: str, key_prefix: Optional[str] = None
         user = st.text_input("Usuário", key=f"{kp}_rs_user")
         password = st.text_input("Senha", type="password", key=f"{kp}_rs_pwd")
         schema = st.text_input("Schema", value="public", key=f"{kp}_rs_schema")
-        return {"host": host, "port": port, "database": database, "user": user, "password": password, "schema": schema}
+        s3_staging_bucket = st.text_input("Bucket S3 para COPY (opcional)", key=f"{kp}_rs_s3_bucket")
+        iam_role = st.text_input("IAM Role ARN para COPY (opcional)", key=f"{kp}_rs_iam_role")
+        return {
+            "host": host, "port": port, "database": database, "user": user, "password": password, "schema": schema,
+            "s3_staging_bucket": s3_staging_bucket, "iam_role": iam_role,
+        }
     elif provider_name == "Google BigQuery":
         st.caption("Faça upload do credentials.json (Service Account)")
         keyfile_upload = st.file_uploader("credentials.json", type=["json"], key=f"{kp}_bq_keyfile")
@@ -79,8 +83,15 @@ def render_credentials_form(provider_name: str, key_prefix: Optional[str] = None
         try:
             key_info = json.loads(keyfile_upload.getvalue().decode("utf-8"))
             project_id = key_info.get("project_id")
-            # Salva arquivo temporário para o provider utilizar via caminho
-            tmp_path = Path.cwd() / f"bq_{kp}_credentials.json"
+            # Salva arquivo temporário para o provider utilizar via caminho; o digest no nome
+            # separa cada chave enviada, inclusive no cache de providers (que usa o caminho)
+            digest = hashlib.sha256(keyfile_upload.getvalue()).hexdigest()[:16]
+            KEYFILE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = KEYFILE_DIR / f"bq_{kp}_{digest}_credentials.json"
+            # chaves enviadas antes neste mesmo formulário não são mais usadas
+            for old in KEYFILE_DIR.glob(f"bq_{kp}_*_credentials.json"):
+                if old != tmp_path:
+                    old.unlink(missing_ok=True)
             tmp_path.write_bytes(keyfile_upload.getvalue())
             return {"project_id": project_id, "dataset": dataset, "keyfile_path": str(tmp_path)}
         except Exception:
@@ -100,6 +111,7 @@ def render_credentials_form(provider_name: str, key_prefix: Optional[str] = None
         cred_file = st.file_uploader("credentials (INI)", type=["txt", "ini"], key=f"{kp}_s3_creds")
         bucket = st.text_input("Bucket", key=f"{kp}_s3_bucket")
         prefix = st.text_input("Prefixo (opcional)", key=f"{kp}_s3_prefix")
+        use_s3_select = st.checkbox("Filtrar exclusões CSV no S3 (S3 Select)", key=f"{kp}_s3_select")
         if cred_file is None:
             return None
         try:
@@ -115,6 +127,7 @@ def render_credentials_form(provider_name: str, key_prefix: Optional[str] = None
                 "region": sect.get("region", None),
                 "bucket": bucket,
                 "prefix": prefix,
+                "use_s3_select": use_s3_select,
             }
             return creds
         except Exception:
@@ -127,150 +140,214 @@ def render_credentials_form(provider_name: str, key_prefix: Optional[str] = None
 
 def make_provider(provider_name: str, creds: Dict):
     if provider_name == "SQLite (local)":
+        from core.providers.sqlite_provider import SQLiteProvider
         return SQLiteProvider(creds)
     if provider_name == "PostgreSQL":
+        from core.providers.postgres_provider import PostgresProvider
         return PostgresProvider(creds)
     if provider_name == "MySQL":
+        from core.providers.mysql_provider import MySQLProvider
         return MySQLProvider(creds)
     if provider_name == "Amazon Redshift":
+        from core.providers.redshift_provider import RedshiftProvider
         return RedshiftProvider(creds)
     if provider_name == "Google BigQuery":
+        from core.providers.bigquery_provider import BigQueryProvider
         return BigQueryProvider(creds)
     if provider_name == "Snowflake":
+        from core.providers.snowflake_provider import SnowflakeProvider
         return SnowflakeProvider(creds)
     if provider_name == "Amazon S3":
+        from core.providers.s3_provider import S3Provider
         return S3Provider(creds)
     else:
         return None
 
 
+def provider_key(creds: Dict) -> str:
+    # Stable digest of the credentials, so secrets are never kept as a raw cache key
+    raw = json.dumps(creds, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@st.cache_resource(max_entries=8, ttl=1800, show_spinner=False)
+def get_provider(provider_name: str, creds_key: str, _creds: Dict):
+    # One connected provider per (service, credentials), reused across reruns; the ttl rebuilds it
+    # periodically so a connection that died (e.g. an expired Snowflake session) is not kept for good
+    prov = make_provider(provider_name, _creds)
+    if prov is not None:
+        prov.connect()
+    return prov
+
+
+def run_side_by_side(*calls):
+    # Runs the calls in worker threads that carry this script run's context, so the st.cache_resource
+    # lookups inside them behave as on the script thread (no "missing ScriptRunContext" warnings)
+    ctx = get_script_run_ctx()
+
+    def with_ctx(call):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return call()
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as ex:
+        futures = [ex.submit(with_ctx, call) for call in calls]
+        return [f.result() for f in futures]
+
+
+def connect_provider(provider_name: str, creds: Dict):
+    try:
+        return get_provider(provider_name, provider_key(creds), creds)
+    except Exception:
+        return None
+
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def cached_quality_report(provider_name: str, creds_key: str, _creds: Dict, table_name: str) -> Dict:
+    prov = get_provider(provider_name, creds_key, _creds)
+    return check_table_quality(prov, table_name)
+
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def cached_preview(provider_name: str, creds_key: str, _creds: Dict, table_name: str, limit: int = 50) -> pd.DataFrame:
+    prov = get_provider(provider_name, creds_key, _creds)
+    return prov.read_table(table_name, limit=limit)
+
+
+def invalidate_table_caches():
+    # Called after any write so reports and previews never show stale data
+    cached_quality_report.clear()
+    cached_preview.clear()
+
+
+# Static styles are kept in one constant and emitted once per run from main();
+# the render_* helpers below only send their data-dependent markup.
+_APP_CSS = """
+<style>
+/* Oculta o ícone de link que aparece ao lado dos títulos ao passar o mouse */
+h1 a, h2 a, h3 a, h4 a, h5 a, h6 a { display: none !important; visibility: hidden !important; }
+.vbar {width: 2px; background: #9ca3af; border-radius: 1px;}
+.stretch {height: 100%; min-height: 420px;}
+.transfer-container {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    gap: 24px;
+    padding: 24px 16px;
+    border-radius: 16px;
+    background: linear-gradient(135deg, #0e1117, #111827);
+    border: 1px solid #2e3440;
+}
+.service {
+    flex: 0 0 200px;
+    height: 140px;
+    border-radius: 16px;
+    background: #151a24;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    color: #e5e7eb;
+    font-weight: 600;
+    font-size: 18px;
+    border: 1px solid #2e3440;
+    box-shadow: 0 6px 24px rgba(0,0,0,0.35);
+}
+.arrow-area {
+    position: relative;
+    flex: 1 1 auto;
+    height: 120px;
+}
+.arrow {
+    position: absolute;
+    top: 50%;
+    left: 0;
+    right: 0;
+    height: 6px;
+    background: #374151;
+    transform: translateY(-50%);
+    border-radius: 6px;
+    overflow: hidden;
+}
+.arrow:after {
+    content: "";
+    position: absolute;
+    right: 0;
+    top: -6px;
+    width: 0;
+    height: 0;
+    border-top: 12px solid transparent;
+    border-bottom: 12px solid transparent;
+    border-left: 18px solid #4f46e5;
+}
+.packet {
+    position: absolute;
+    top: -6px;
+    width: 18px;
+    height: 18px;
+    border-radius: 50%;
+    background: linear-gradient(135deg, #60a5fa, #4f46e5);
+    box-shadow: 0 4px 12px rgba(79,70,229,0.45);
+    animation: move 2.2s linear infinite;
+}
+.packet.p2 { animation-delay: 0.5s; }
+.packet.p3 { animation-delay: 1.1s; }
+.packet.p4 { animation-delay: 1.6s; }
+@keyframes move {
+    0% { left: -10%; opacity: 0; }
+    10% { opacity: 1; }
+    90% { opacity: 1; }
+    100% { left: 100%; opacity: 0; }
+}
+.loader-wrap {
+    display: flex; align-items: center; gap: 12px;
+    padding: 14px 16px; border-radius: 12px; border: 1px solid #2e3440;
+    background: #0f1420; color: #e5e7eb; font-weight: 500;
+}
+.loader {
+    width: 24px; height: 24px; border: 3px solid #374151;
+    border-top-color: #22d3ee; border-radius: 50%;
+    animation: spin 0.9s linear infinite;
+}
+@keyframes spin { to { transform: rotate(360deg); } }
+</style>
+"""
+
+_TRANSFER_HTML = """
+<div class="transfer-container">
+  <div class="service">{src}</div>
+  <div class="arrow-area">
+    <div class="arrow">
+      <div class="packet"></div>
+      <div class="packet p2"></div>
+      <div class="packet p3"></div>
+      <div class="packet p4"></div>
+    </div>
+  </div>
+  <div class="service">{dst}</div>
+</div>
+"""
+
+_LOADER_HTML = """
+<div class="loader-wrap">
+  <div class="loader"></div>
+  <div>{label}</div>
+</div>
+"""
+
+
+def inject_css():
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
+
+
 def render_transfer_animation(src_label: str, dst_label: str):
-    st.markdown(
-        """
-        <style>
-        .transfer-container {
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            gap: 24px;
-            padding: 24px 16px;
-            border-radius: 16px;
-            background: linear-gradient(135deg, #0e1117, #111827);
-            border: 1px solid #2e3440;
-        }
-        .service {
-            flex: 0 0 200px;
-            height: 140px;
-            border-radius: 16px;
-            background: #151a24;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: #e5e7eb;
-            font-weight: 600;
-            font-size: 18px;
-            border: 1px solid #2e3440;
-            box-shadow: 0 6px 24px rgba(0,0,0,0.35);
-        }
-        .arrow-area {
-            position: relative;
-            flex: 1 1 auto;
-            height: 120px;
-        }
-        .arrow {
-            position: absolute;
-            top: 50%;
-            left: 0;
-            right: 0;
-            height: 6px;
-            background: #374151;
-            transform: translateY(-50%);
-            border-radius: 6px;
-            overflow: hidden;
-        }
-        .arrow:after {
-            content: "";
-            position: absolute;
-            right: 0;
-            top: -6px;
-            width: 0;
-            height: 0;
-            border-top: 12px solid transparent;
-            border-bottom: 12px solid transparent;
-            border-left: 18px solid #4f46e5;
-        }
-        .packet {
-            position: absolute;
-            top: -6px;
-            width: 18px;
-            height: 18px;
-            border-radius: 50%;
-            background: linear-gradient(135deg, #60a5fa, #4f46e5);
-            box-shadow: 0 4px 12px rgba(79,70,229,0.45);
-            animation: move 2.2s linear infinite;
-        }
-        .packet.p2 { animation-delay: 0.5s; }
-        .packet.p3 { animation-delay: 1.1s; }
-        .packet.p4 { animation-delay: 1.6s; }
-        @keyframes move {
-            0% { left: -10%; opacity: 0; }
-            10% { opacity: 1; }
-            90% { opacity: 1; }
-            100% { left: 100%; opacity: 0; }
-        }
-        </style>
-        <div class="transfer-container">
-          <div class="service">{src}</div>
-          <div class="arrow-area">
-            <div class="arrow">
-              <div class="packet"></div>
-              <div class="packet p2"></div>
-              <div class="packet p3"></div>
-              <div class="packet p4"></div>
-            </div>
-          </div>
-          <div class="service">{dst}</div>
-        </div>
-        """.format(src=src_label, dst=dst_label), unsafe_allow_html=True,
-    )
+    st.markdown(_TRANSFER_HTML.format(src=src_label, dst=dst_label), unsafe_allow_html=True)
 
 
 def render_loading_animation(label: str = "Analisando dados..."):
-    st.markdown(
-        f"""
-        <style>
-        .loader-wrap {{
-            display: flex; align-items: center; gap: 12px;
-            padding: 14px 16px; border-radius: 12px; border: 1px solid #2e3440;
-            background: #0f1420; color: #e5e7eb; font-weight: 500;
-        }}
-        .loader {{
-            width: 24px; height: 24px; border: 3px solid #374151;
-            border-top-color: #22d3ee; border-radius: 50%;
-            animation: spin 0.9s linear infinite;
-        }}
-        @keyframes spin {{ to {{ transform: rotate(360deg); }} }}
-        </style>
-        <div class="loader-wrap">
-          <div class="loader"></div>
-          <div>{label}</div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_LOADER_HTML.format(label=label), unsafe_allow_html=True)
 
 
 def page_migrate():
     st.header("Migrar dados")
-    st.markdown(
-        """
-        <style>
-        .vbar {width: 2px; background: #9ca3af; border-radius: 1px;}
-        .stretch {height: 100%; min-height: 420px;}
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
     c1, cMid, c2 = st.columns([1, 0.02, 1])
     with c1:
         src_name = provider_selector("Serviço de origem")
@@ -288,20 +365,17 @@ def page_migrate():
         if not src_creds or not dst_creds:
             st.error("Preencha as credenciais necessárias.")
             return
-        src = make_provider(src_name, src_creds)
-        dst = make_provider(dst_name, dst_creds)
+        # source and destination handshakes are independent, so run them side by side
+        src, dst = run_side_by_side(
+            lambda: connect_provider(src_name, src_creds), lambda: connect_provider(dst_name, dst_creds)
+        )
         if not src or not dst:
-            st.warning("Selecione conectores compatíveis. SQLite está funcional nesta versão.")
-            return
-
-        ok_src = src.test_connection()
-        ok_dst = dst.test_connection()
-        if not ok_src or not ok_dst:
             st.error("Falha ao conectar ao serviço de origem ou destino.")
             return
 
-        perms_src = src.has_permissions(["read"]) if hasattr(src, "has_permissions") else {"read": True}
-        perms_dst = dst.has_permissions(["write"]) if hasattr(dst, "has_permissions") else {"write": True}
+        perms_src, perms_dst = run_side_by_side(
+            lambda: src.has_permissions(["read"]), lambda: dst.has_permissions(["write"])
+        )
         if not perms_src.get("read"):
             st.error("Credencial de origem sem permissão de leitura.")
             return
@@ -312,16 +386,17 @@ def page_migrate():
         render_transfer_animation(src_name, dst_name)
         prog = st.progress(0)
 
+        def on_progress(done: int, total: int):
+            if total:
+                prog.progress(min(done / total, 1.0))
+
         try:
-            for i in range(0, 60, 10):
-                prog.progress(i / 100)
-            migrated_rows = migrate_table(src, dst, table_name)
+            migrated_rows = migrate_table(src, dst, table_name, progress_cb=on_progress)
+            invalidate_table_caches()
             prog.progress(1.0)
             st.success(f"Migração concluída: {migrated_rows} linhas transferidas.")
         except Exception as e:
             st.error(f"Erro durante a migração: {e}")
-        finally:
-            src.close(); dst.close()
 
 
 def page_check():
@@ -334,16 +409,13 @@ def page_check():
         if not creds:
             st.error("Preencha as credenciais necessárias.")
             return
-        prov = make_provider(name, creds)
+        prov = connect_provider(name, creds)
         if not prov:
-            st.warning("Conector não disponível. Utilize SQLite nesta versão.")
-            return
-        if not prov.test_connection():
             st.error("Falha ao conectar.")
             return
         render_loading_animation()
         try:
-            report = check_table_quality(prov, table_name)
+            report = cached_quality_report(name, provider_key(creds), creds, table_name)
             st.subheader("Resultado da análise")
             st.write(report)
             if report.get("duplicates", 0) > 0:
@@ -353,11 +425,10 @@ def page_check():
                         st.warning("Credencial sem permissão de escrita para aplicar correções.")
                     else:
                         fixed = apply_corrections(prov, table_name)
+                        invalidate_table_caches()
                         st.success(f"Correções aplicadas. Removidos {fixed} duplicados.")
         except Exception as e:
             st.error(f"Erro na análise: {e}")
-        finally:
-            prov.close()
 
 
 def page_add():
@@ -371,8 +442,8 @@ def page_add():
         if not creds:
             st.error("Preencha as credenciais necessárias.")
             return
-        prov = make_provider(name, creds)
-        if not prov or not prov.test_connection():
+        prov = connect_provider(name, creds)
+        if not prov:
             st.error("Falha ao conectar.")
             return
         if not file:
@@ -385,11 +456,10 @@ def page_add():
                 df = pd.read_excel(file)
             st.write("Pré-visualização:", df.head())
             rows = add_data_from_dataframe(prov, table_name, df)
+            invalidate_table_caches()
             st.success(f"Dados adicionados com sucesso: {rows} linhas.")
         except Exception as e:
             st.error(f"Erro ao adicionar dados: {e}")
-        finally:
-            prov.close()
 
 
 def page_delete():
@@ -398,20 +468,19 @@ def page_delete():
     creds = render_credentials_form(name, key_prefix="delete")
     if not creds:
         st.stop()
-    prov = make_provider(name, creds)
-    if not prov or not prov.test_connection():
+    prov = connect_provider(name, creds)
+    if not prov:
         st.error("Falha ao conectar.")
         st.stop()
 
     tables = prov.list_tables()
     if not tables:
         st.info("Nenhuma tabela encontrada.")
-        prov.close()
         st.stop()
     table = st.selectbox("Tabela", tables)
     st.write("Amostra:")
     try:
-        df = prov.read_table(table, limit=50)
+        df = cached_preview(name, provider_key(creds), creds, table, limit=50)
         st.dataframe(df)
     except Exception:
         st.info("Não foi possível ler a amostra da tabela.")
@@ -424,6 +493,7 @@ def page_delete():
                 st.warning("Credencial sem permissão de escrita para excluir.")
             else:
                 prov.delete_table(table)
+                invalidate_table_caches()
                 st.success("Tabela excluída.")
     with c2:
         where = st.text_input("Cláusula WHERE para excluir linhas (opcional)", value="", key="delete_where_clause")
@@ -433,22 +503,14 @@ def page_delete():
                 st.warning("Credencial sem permissão de escrita para excluir.")
             else:
                 deleted = prov.delete_rows(table, where if where.strip() else None)
+                invalidate_table_caches()
                 st.success(f"{deleted} linhas excluídas.")
-    prov.close()
 
 
 def main():
     st.title("DeltaGuard")
     st.caption("Dados em movimento, confiança garantida — migre, valide e avance.")
-    # Oculta o ícone de link que aparece ao lado dos títulos ao passar o mouse
-    st.markdown(
-        """
-        <style>
-        h1 a, h2 a, h3 a, h4 a, h5 a, h6 a { display: none !important; visibility: hidden !important; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    inject_css()
 
     page = st.sidebar.radio(
         "Objetivo",
@@ -1,24 +1,128 @@
-from typing import Dict
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+import queue
+import threading
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from .providers.base import DataProvider
 
 
-def migrate_table(source: DataProvider, dest: DataProvider, table_name: str, chunk_size: int = 5000) -> int:
-    df = source.read_table(table_name)
-    if df.empty:
-        # ensure table exists on destination
-        dest.write_table(table_name, df, if_exists="append")
-        return 0
+_DONE = object()
+
+# single pass over every object cell; non-strings (None, NaN, bytes) never count
+_ends_with_ellipsis = np.frompyfunc(lambda v: isinstance(v, str) and v.endswith("..."), 1, 1)
+
+
+def _count_truncated_like(df: pd.DataFrame) -> int:
+    # naive heuristic: strings ending with '...' considered truncated-like
     total = 0
-    if len(df) <= chunk_size:
-        total += dest.write_table(table_name, df, if_exists="append")
-    else:
-        for i in range(0, len(df), chunk_size):
-            total += dest.write_table(table_name, df.iloc[i : i + chunk_size], if_exists="append")
+    for c in df.columns:
+        dtype = df[c].dtype
+        if isinstance(dtype, pd.ArrowDtype) and (
+            pa.types.is_string(dtype.pyarrow_dtype) or pa.types.is_large_string(dtype.pyarrow_dtype)
+        ):
+            # Arrow-backed strings are checked by a C kernel over the Utf8 buffer, no PyObjects created
+            total += pc.sum(pc.ends_with(pa.array(df[c].array), pattern="...")).as_py() or 0
+    obj = df.select_dtypes(include="object")
+    if not obj.empty:
+        total += int(_ends_with_ellipsis(obj.to_numpy(dtype=object, copy=False)).sum())
     return total
 
 
+def _prefetch(chunks: Iterable[pd.DataFrame], maxsize: int = 2) -> Iterator[pd.DataFrame]:
+    # Reads chunks on a background thread so the next read overlaps the current write.
+    # The bounded queue keeps at most `maxsize` chunks in memory.
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for chunk in chunks:
+                if not put((chunk, None)):
+                    return
+        except Exception as e:
+            put((None, e))
+            return
+        put((_DONE, None))
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item, err = q.get()
+            if err is not None:
+                raise err
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
+        worker.join()
+
+
+def migrate_table(
+    source: DataProvider,
+    dest: DataProvider,
+    table_name: str,
+    chunk_size: int = 5000,
+    max_workers: int = 4,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    # progress_cb(rows_done, total_rows_estimate) runs on the calling thread after every chunk;
+    # the estimate is 0 when the source cannot count rows cheaply.
+    expected = (source.count_rows(table_name) or 0) if progress_cb else 0
+    total = 0
+
+    def written(n: int) -> None:
+        nonlocal total
+        total += n
+        if progress_cb:
+            progress_cb(total, expected)
+
+    chunks = _prefetch(source.read_table_iter(table_name, chunk_size))
+    try:
+        # read_table_iter yields at least one frame, so an empty source still creates the table on destination.
+        # The first chunk is written alone so the table exists before any concurrent appends.
+        first = next(chunks, None)
+        if first is None:
+            return 0
+        written(dest.write_table(table_name, first, if_exists="append"))
+        workers = max_workers if dest.parallel_writes else 1
+        if workers <= 1:
+            for chunk in chunks:
+                written(dest.write_table(table_name, chunk, if_exists="append"))
+            return total
+        # Only "append" writes are submitted concurrently; "replace" would race between chunks.
+        pending = set()
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for chunk in chunks:
+                pending.add(ex.submit(dest.write_table, table_name, chunk, "append"))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        written(f.result())
+            for f in as_completed(pending):
+                written(f.result())
+        return total
+    finally:
+        chunks.close()
+
+
 def check_table_quality(provider: DataProvider, table_name: str) -> Dict:
+    stats = provider.quality_stats(table_name)
+    if stats is not None:
+        return stats
     df = provider.read_table(table_name)
     report = {
         "rows": len(df),
@@ -31,25 +135,13 @@ def check_table_quality(provider: DataProvider, table_name: str) -> Dict:
         return report
     dups = df.duplicated(keep="first").sum()
     report["duplicates"] = int(dups)
-    nulls = {c: int(df[c].isna().sum()) for c in df.columns}
-    report["nulls_by_column"] = nulls
-    # naive heuristic: strings ending with '...' considered truncated-like
-    truncated_like = 0
-    for c in df.select_dtypes(include="object").columns:
-        truncated_like += int(df[c].astype(str).str.endswith("...").sum())
-    report["truncated_like"] = truncated_like
+    report["nulls_by_column"] = {c: int(n) for c, n in df.isna().sum().items()}
+    report["truncated_like"] = _count_truncated_like(df)
     return report
 
 
 def apply_corrections(provider: DataProvider, table_name: str) -> int:
-    df = provider.read_table(table_name)
-    if df.empty:
-        return 0
-    before = len(df)
-    df2 = df.drop_duplicates(keep="first").reset_index(drop=True)
-    provider.delete_table(table_name)
-    provider.write_table(table_name, df2, if_exists="replace")
-    return before - len(df2)
+    return provider.deduplicate(table_name)
 
 
 def add_data_from_dataframe(provider: DataProvider, table_name: str, df: pd.DataFrame) -> int:
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 import pandas as pd
 
 
 class DataProvider(ABC):
+    # True when concurrent write_table(..., if_exists="append") calls on one instance are safe
+    parallel_writes = False
+
     def __init__(self, credentials: Dict):
         self.credentials = credentials
         self._connected = False
@@ -29,9 +32,34 @@ class DataProvider(ABC):
         ...
 
     @abstractmethod
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         ...
 
+    def read_table_iter(self, table_name: str, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+        # Base implementation slices a full read; providers with cursor/page support should override.
+        # Always yields at least one (possibly empty) frame so callers can still create the table.
+        df = self.read_table(table_name)
+        if df.empty:
+            yield df
+            return
+        # Positional slices share the frame's blocks; with a RangeIndex the index slice is O(1) too,
+        # so no chunk copies data (writers never use the index).
+        if not isinstance(df.index, pd.RangeIndex):
+            df.index = pd.RangeIndex(len(df))
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start : start + chunk_size]
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        # Cheap row count used for progress estimates; None when the provider cannot count without a full read
+        return None
+
+    def quality_stats(self, table_name: str) -> Optional[Dict]:
+        # Providers that can compute the quality report in SQL return it here; None means
+        # the caller should fall back to reading the table into pandas.
+        return None
+
     @abstractmethod
     def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
         ...
@@ -40,6 +68,19 @@ class DataProvider(ABC):
     def delete_rows(self, table_name: str, where_clause: Optional[str] = None) -> int:
         ...
 
+    def deduplicate(self, table_name: str) -> int:
+        # Base implementation rewrites the table client-side; warehouses should override with SQL
+        df = self.read_table(table_name)
+        if df.empty:
+            return 0
+        before = len(df)
+        df2 = df.drop_duplicates(keep="first").reset_index(drop=True)
+        if len(df2) == before:
+            return 0
+        self.delete_table(table_name)
+        self.write_table(table_name, df2, if_exists="replace")
+        return before - len(df2)
+
     @abstractmethod
     def delete_table(self, table_name: str) -> None:
         ...
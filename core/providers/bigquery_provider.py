@@ -1,13 +1,55 @@
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+from io import BytesIO
+import json
 import pandas as pd
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 from .base import DataProvider
 
+try:
+    from google.cloud import bigquery_storage
+except ImportError:  # Storage Read API is optional; reads fall back to the REST path
+    bigquery_storage = None
+
+
+# pandas dtypes that write the Parquet physical type each BigQuery column type expects
+_PANDAS_DTYPES = {
+    "INTEGER": "Int64",
+    "INT64": "Int64",
+    "FLOAT": "float64",
+    "FLOAT64": "float64",
+    "BOOLEAN": "boolean",
+    "BOOL": "boolean",
+    "STRING": "string",
+}
+
+
+def _coerce_to_schema(df: pd.DataFrame, schema) -> pd.DataFrame:
+    out = df.copy(deep=False)
+    for field in schema:
+        if field.name not in out.columns or field.mode == "REPEATED":
+            continue
+        col = out[field.name]
+        if field.field_type in _PANDAS_DTYPES:
+            out[field.name] = col.astype(_PANDAS_DTYPES[field.field_type])
+        elif field.field_type == "TIMESTAMP":
+            out[field.name] = pd.to_datetime(col, utc=True)
+        elif field.field_type == "DATETIME":
+            out[field.name] = pd.to_datetime(col)
+        elif field.field_type == "DATE":
+            dates = pd.to_datetime(col)
+            out[field.name] = dates.dt.date.astype(object).where(dates.notna(), None)
+    return out
+
 
 class BigQueryProvider(DataProvider):
+    parallel_writes = True
+
     def __init__(self, credentials: Dict):
         super().__init__(credentials)
         self.client: Optional[bigquery.Client] = None
+        self._bqstorage = None
+        self._perms: Dict[str, bool] = {}
 
     def connect(self) -> None:
         project_id = self.credentials.get("project_id")
@@ -21,39 +63,74 @@ class BigQueryProvider(DataProvider):
             self.client = bigquery.Client(project=project_id)
         # smoke test
         _ = list(self.client.list_datasets())
+        self._perms = {}
         self._connected = True
 
+    def _bqstorage_client(self):
+        # Built once per provider; Arrow streams are much cheaper than paging rows over REST
+        if self._bqstorage is None and bigquery_storage is not None:
+            keyfile_path = self.credentials.get("keyfile_path")
+            if keyfile_path:
+                self._bqstorage = bigquery_storage.BigQueryReadClient.from_service_account_file(keyfile_path)
+            else:
+                self._bqstorage = bigquery_storage.BigQueryReadClient()
+        return self._bqstorage
+
     def test_connection(self) -> bool:
         try:
             self.connect()
-            self.client.query("SELECT 1").result()
-            return True
+            self._perms["read"] = self._can_query()
+            return self._perms["read"]
         except Exception:
             return False
 
-    def has_permissions(self, actions: List[str]) -> Dict[str, bool]:
-        res = {}
-        # read
+    def _can_query(self) -> bool:
         try:
             self.client.query("SELECT 1").result()
-            res["read"] = True
+            return True
         except Exception:
-            res["read"] = False
-        # write (try creating a temp table if dataset is provided)
-        dataset = self.credentials.get("dataset")
+            return False
+
+    def _service_account_email(self) -> Optional[str]:
+        keyfile_path = self.credentials.get("keyfile_path")
+        if not keyfile_path:
+            return None
         try:
-            if dataset:
-                table_id = f"{self.client.project}.{dataset}.__perm_test"
-                schema = [bigquery.SchemaField("c", "STRING")]
-                table = bigquery.Table(table_id, schema=schema)
-                table = self.client.create_table(table, exists_ok=True)
-                self.client.delete_table(table_id, not_found_ok=True)
-                res["write"] = True
-            else:
-                res["write"] = True
+            with open(keyfile_path, encoding="utf-8") as fh:
+                return json.load(fh).get("client_email")
         except Exception:
-            res["write"] = False
-        return {a: res.get(a, True) for a in actions}
+            return None
+
+    def _can_write(self, dataset: str) -> bool:
+        # A write grant naming this service account in the dataset ACL answers with one metadata read.
+        # Special groups such as projectWriters are in every default ACL and say nothing about this
+        # account, and project-level IAM grants are not listed at all, so those cases fall back to
+        # creating a throwaway table.
+        email = self._service_account_email()
+        if email:
+            ds = self.client.get_dataset(f"{self.client.project}.{dataset}")
+            for entry in ds.access_entries:
+                if entry.role not in ("WRITER", "OWNER", "roles/bigquery.dataEditor", "roles/bigquery.dataOwner"):
+                    continue
+                if entry.entity_id == email:
+                    return True
+        table_id = f"{self.client.project}.{dataset}.__perm_test"
+        table = bigquery.Table(table_id, schema=[bigquery.SchemaField("c", "STRING")])
+        self.client.create_table(table, exists_ok=True)
+        self.client.delete_table(table_id, not_found_ok=True)
+        return True
+
+    def has_permissions(self, actions: List[str]) -> Dict[str, bool]:
+        # results are kept for the session; they are reset on the next connect()
+        if "read" in actions and "read" not in self._perms:
+            self._perms["read"] = self._can_query()
+        if "write" in actions and "write" not in self._perms:
+            dataset = self.credentials.get("dataset")
+            try:
+                self._perms["write"] = self._can_write(dataset) if dataset else True
+            except Exception:
+                self._perms["write"] = False
+        return {a: self._perms.get(a, True) for a in actions}
 
     def list_datasets(self) -> List[str]:
         return [d.dataset_id for d in self.client.list_datasets()]
@@ -71,24 +148,88 @@ class BigQueryProvider(DataProvider):
         dataset = self.credentials.get("dataset")
         return f"{self.client.project}.{dataset}.{table_name}"
 
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         full = self._full_table_ref(table_name)
-        q = f"SELECT * FROM `{full}`"
+        projection = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+        q = f"SELECT {projection} FROM `{full}`"
         if limit and limit > 0:
+            table = self.client.get_table(full)
+            if table.table_type == "TABLE":
+                # tabledata.list reads only the first rows and is not billed, unlike SELECT ... LIMIT
+                fields = [f for f in table.schema if f.name in columns] if columns else None
+                rows = self.client.list_rows(table, selected_fields=fields, max_results=int(limit))
+                return rows.to_arrow(create_bqstorage_client=False).to_pandas(types_mapper=pd.ArrowDtype)
             q += f" LIMIT {int(limit)}"
         job = self.client.query(q)
-        df = job.result().to_dataframe()
-        return df
+        arrow_tbl = job.result().to_arrow(bqstorage_client=self._bqstorage_client())
+        return arrow_tbl.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def read_table_iter(self, table_name: str, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+        full = self._full_table_ref(table_name)
+        rows = self.client.query(f"SELECT * FROM `{full}`").result(page_size=chunk_size)
+        empty = True
+        for df in rows.to_dataframe_iterable(bqstorage_client=self._bqstorage_client()):
+            empty = False
+            yield df
+        if empty:
+            # keep the column names so the destination table can still be created
+            yield pd.DataFrame(columns=[f.name for f in rows.schema])
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        # table metadata, no query job
+        return self.client.get_table(self._full_table_ref(table_name)).num_rows
+
+    def quality_stats(self, table_name: str) -> Optional[Dict]:
+        full = self._full_table_ref(table_name)
+        fields = self.client.get_table(full).schema
+        exprs = [
+            "COUNT(*) AS n",
+            # TO_JSON_STRING makes whole rows comparable even with STRUCT/ARRAY columns
+            f"(SELECT COUNT(DISTINCT TO_JSON_STRING(r)) FROM `{full}` AS r) AS n_distinct",
+        ]
+        for i, f in enumerate(fields):
+            exprs.append(f"COUNTIF(`{f.name}` IS NULL) AS null_{i}")
+        text_cols = [f.name for f in fields if f.field_type == "STRING" and f.mode != "REPEATED"]
+        if text_cols:
+            counts = " + ".join(f"COUNTIF(ENDS_WITH(`{c}`, '...'))" for c in text_cols)
+            exprs.append(f"({counts}) AS trunc")
+        row = list(self.client.query(f"SELECT {', '.join(exprs)} FROM `{full}`").result())[0]
+        n = int(row["n"] or 0)
+        return {
+            "rows": n,
+            "columns": [f.name for f in fields],
+            "duplicates": n - int(row["n_distinct"] or 0),
+            "nulls_by_column": {f.name: int(row[f"null_{i}"] or 0) for i, f in enumerate(fields)},
+            "truncated_like": int(row["trunc"] or 0) if text_cols else 0,
+        }
 
     def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
         full = self._full_table_ref(table_name)
-        table = self.client.get_table(full) if if_exists != "replace" else None
         if if_exists == "replace":
             try:
                 self.client.delete_table(full)
             except Exception:
                 pass
-        job = self.client.load_table_from_dataframe(df, full)
+        else:
+            try:
+                schema = self.client.get_table(full).schema
+            except NotFound:
+                schema = None
+            if schema:
+                # chunks infer their own dtypes (an INT column with a NULL arrives as float64), and a Parquet
+                # load rejects physical types that differ from the table's, so each chunk follows the table
+                df = _coerce_to_schema(df, schema)
+        bio = BytesIO()
+        df.to_parquet(bio, index=False)
+        bio.seek(0)
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            create_disposition=bigquery.CreateDisposition.CREATE_IF_NEEDED,
+        )
+        job = self.client.load_table_from_file(bio, full, job_config=job_config)
         job.result()
         return len(df)
 
@@ -102,9 +243,31 @@ class BigQueryProvider(DataProvider):
         res = job.result()
         return getattr(res, "num_dml_affected_rows", 0) or 0
 
+    def deduplicate(self, table_name: str) -> int:
+        full = self._full_table_ref(table_name)
+        # TO_JSON_STRING makes whole rows comparable even with STRUCT/ARRAY columns
+        count = f"SELECT COUNT(*) - COUNT(DISTINCT TO_JSON_STRING(t)) AS dups FROM `{full}` AS t"
+        dups = next(iter(self.client.query(count).result())).dups or 0
+        if not dups:
+            return 0
+        # Rows are replaced in place rather than with CREATE OR REPLACE, which would drop the table's
+        # partitioning, clustering and descriptions
+        script = f"""
+            BEGIN TRANSACTION;
+            CREATE TEMP TABLE __dedup AS
+              SELECT * FROM `{full}` AS t WHERE TRUE
+              QUALIFY ROW_NUMBER() OVER (PARTITION BY TO_JSON_STRING(t)) = 1;
+            DELETE FROM `{full}` WHERE TRUE;
+            INSERT INTO `{full}` SELECT * FROM __dedup;
+            COMMIT TRANSACTION;
+        """
+        self.client.query(script).result()
+        return int(dups)
+
     def delete_table(self, table_name: str) -> None:
         full = self._full_table_ref(table_name)
         self.client.delete_table(full, not_found_ok=True)
 
     def close(self) -> None:
+        self._bqstorage = None
         self._connected = False
\ No newline at end of file
@@ -5,6 +5,8 @@ from .base import DataProvider
 
 
 class MySQLProvider(DataProvider):
+    parallel_writes = True
+
     def __init__(self, credentials: Dict):
         super().__init__(credentials)
         self.engine = None
@@ -51,13 +53,20 @@ class MySQLProvider(DataProvider):
         insp = inspect(self.engine)
         return insp.get_table_names()
 
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
-        q = f"SELECT * FROM `{table_name}`"
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        projection = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+        q = f"SELECT {projection} FROM `{table_name}`"
         if limit and limit > 0:
             q += f" LIMIT {int(limit)}"
         with self.engine.connect() as conn:
             return pd.read_sql_query(q, conn)
 
+    def count_rows(self, table_name: str) -> Optional[int]:
+        with self.engine.connect() as conn:
+            return int(conn.execute(text(f"SELECT COUNT(*) FROM `{table_name}`")).scalar() or 0)
+
     def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
         df.to_sql(table_name, self.engine, if_exists=if_exists, index=False)
         return len(df)
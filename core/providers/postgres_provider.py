@@ -1,10 +1,18 @@
 from typing import List, Dict, Optional
+from io import StringIO
 import pandas as pd
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, String, create_engine, text, inspect
 from .base import DataProvider
 
 
+# Column types whose COPY CSV text converts back exactly; tables with any other type are read
+# through the driver instead
+_COPY_TYPES = (Boolean, Date, DateTime, Integer, Numeric, String)
+
+
 class PostgresProvider(DataProvider):
+    parallel_writes = True
+
     def __init__(self, credentials: Dict):
         super().__init__(credentials)
         self.engine = None
@@ -54,14 +62,66 @@ class PostgresProvider(DataProvider):
         schema = self.credentials.get("schema", "public")
         return insp.get_table_names(schema=schema)
 
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         schema = self.credentials.get("schema", "public")
-        q = f'SELECT * FROM "{schema}"."{table_name}"'
+        projection = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        q = f'SELECT {projection} FROM "{schema}"."{table_name}"'
         if limit and limit > 0:
             q += f" LIMIT {int(limit)}"
+        types = {c["name"]: c["type"] for c in inspect(self.engine).get_columns(table_name, schema=schema)}
+        if all(isinstance(t, _COPY_TYPES) for t in types.values()):
+            try:
+                return self._read_via_copy(q, types)
+            except AttributeError:
+                # driver without copy_expert (not psycopg2)
+                pass
+            except (ValueError, OverflowError):
+                # text the conversions below cannot parse ('infinity', BC dates, ...); the driver can
+                pass
+        # other types (arrays, json, intervals, ...) keep the Python objects the driver builds
         with self.engine.connect() as conn:
             return pd.read_sql_query(q, conn)
 
+    def _read_via_copy(self, q: str, types: Dict) -> pd.DataFrame:
+        # COPY streams the result as CSV in one go, skipping per-row Python object construction.
+        # An explicit NULL marker keeps NULL apart from empty strings.
+        buf = StringIO()
+        raw = self.engine.raw_connection()
+        try:
+            cur = raw.cursor()
+            cur.copy_expert(f"COPY ({q}) TO STDOUT WITH (FORMAT csv, HEADER, NULL '\\N')", buf)
+            cur.close()
+        finally:
+            raw.close()
+        buf.seek(0)
+        # integers are left to pandas' inference and NUMERIC/float columns are read as float64 (what
+        # read_sql_query's coerce_float makes of Decimals); everything else is parsed as text and
+        # converted below to what read_sql_query returns
+        dtypes = {
+            n: "float64" if isinstance(t, Numeric) else str for n, t in types.items() if not isinstance(t, Integer)
+        }
+        # numeric columns also print NaN as text; in text columns "NaN" is a value like any other
+        na_values = {n: ["\\N", "NaN"] if isinstance(t, Numeric) else ["\\N"] for n, t in types.items()}
+        df = pd.read_csv(buf, dtype=dtypes, keep_default_na=False, na_values=na_values)
+        for name, type_ in types.items():
+            if name not in df.columns:
+                continue
+            if isinstance(type_, Boolean):
+                df[name] = df[name].map({"t": True, "f": False})
+            elif isinstance(type_, DateTime):
+                # the fractional part is left out when zero, so the format must not be inferred from one value
+                df[name] = pd.to_datetime(df[name], utc=bool(type_.timezone), format="ISO8601")
+            elif isinstance(type_, Date):
+                df[name] = pd.to_datetime(df[name], format="ISO8601").dt.date
+        return df
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        schema = self.credentials.get("schema", "public")
+        with self.engine.connect() as conn:
+            return int(conn.execute(text(f'SELECT COUNT(*) FROM "{schema}"."{table_name}"')).scalar() or 0)
+
     def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
         schema = self.credentials.get("schema", "public")
         df.to_sql(table_name, self.engine, if_exists=if_exists, index=False, schema=schema)
@@ -1,27 +1,97 @@
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+from io import BytesIO
+import threading
+import uuid
 import pandas as pd
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, String, create_engine, text, inspect
+from sqlalchemy.engine import Engine
 from .base import DataProvider
 
 
+# Below this many rows a COPY round-trip through S3 costs more than a batched INSERT
+COPY_MIN_ROWS = 1000
+# Rows fetched per round-trip from server-side cursors
+STREAM_BUFFER_ROWS = 10000
+
+# Engines (and their connection pools) are shared by every provider built with the same URL
+_ENGINE_CACHE: Dict[str, Engine] = {}
+_ENGINE_LOCK = threading.Lock()
+
+
+def _get_engine(url: str) -> Engine:
+    with _ENGINE_LOCK:
+        engine = _ENGINE_CACHE.get(url)
+        if engine is None:
+            engine = create_engine(
+                url,
+                pool_size=10,
+                max_overflow=20,
+                pool_pre_ping=True,
+                pool_recycle=1800,
+                connect_args={"keepalives": 1},
+            )
+            _ENGINE_CACHE[url] = engine
+        return engine
+
+
+def _coerce_to_columns(df: pd.DataFrame, columns: Dict) -> pd.DataFrame:
+    # Chunks infer their own dtypes (an integer column with a NULL arrives as float64), and COPY from Parquet
+    # rejects physical types that differ from the table's, so each chunk is cast to the table's columns
+    out = df.copy(deep=False)
+    for name, type_ in columns.items():
+        if name not in out.columns:
+            continue
+        col = out[name]
+        if isinstance(type_, Integer):
+            out[name] = col.astype("Int64")
+        elif isinstance(type_, Numeric):
+            out[name] = col.astype("float64")
+        elif isinstance(type_, Boolean):
+            out[name] = col.astype("boolean")
+        elif isinstance(type_, String):
+            out[name] = col.astype("string")
+        elif isinstance(type_, DateTime):
+            out[name] = pd.to_datetime(col, utc=bool(type_.timezone))
+        elif isinstance(type_, Date):
+            dates = pd.to_datetime(col)
+            out[name] = dates.dt.date.astype(object).where(dates.notna(), None)
+    return out
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
 class RedshiftProvider(DataProvider):
+    parallel_writes = True
+
     def __init__(self, credentials: Dict):
         super().__init__(credentials)
         self.engine = None
+        self._perms: Optional[Dict[str, bool]] = None
+        # staging client and destination column types, built once and shared by the parallel chunk writers
+        self._s3 = None
+        self._columns: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
 
-    def connect(self) -> None:
+    def _url(self) -> str:
         user = self.credentials.get("user")
         password = self.credentials.get("password")
         host = self.credentials.get("host")
         port = self.credentials.get("port", 5439)
         database = self.credentials.get("database")
-        url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
-        self.engine = create_engine(url)
+        return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
+
+    def connect(self) -> None:
+        self.engine = _get_engine(self._url())
         with self.engine.connect() as conn:
             conn.execute(text("SELECT 1"))
+        self._perms = None
         self._connected = True
 
     def test_connection(self) -> bool:
+        if self._connected and self.engine is _ENGINE_CACHE.get(self._url()):
+            return True
         try:
             self.connect()
             return True
@@ -29,20 +99,20 @@ class RedshiftProvider(DataProvider):
             return False
 
     def has_permissions(self, actions: List[str]) -> Dict[str, bool]:
-        results = {}
-        try:
-            with self.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            results["read"] = True
-        except Exception:
-            results["read"] = False
-        try:
-            with self.engine.begin() as conn:
-                conn.execute(text("SELECT 1"))
-            results["write"] = True
-        except Exception:
-            results["write"] = False
-        return {a: results.get(a, True) for a in actions}
+        # one catalog query answers both; kept until the next connect()
+        if self._perms is None:
+            schema = self.credentials.get("schema", "public")
+            q = text(
+                "SELECT has_schema_privilege(current_user, :s, 'USAGE') AS r, "
+                "has_schema_privilege(current_user, :s, 'CREATE') AS w"
+            )
+            try:
+                with self.engine.connect() as conn:
+                    row = conn.execute(q, {"s": schema}).one()
+                self._perms = {"read": bool(row.r), "write": bool(row.w)}
+            except Exception:
+                return {a: False if a in ("read", "write") else True for a in actions}
+        return {a: self._perms.get(a, True) for a in actions}
 
     def list_datasets(self) -> List[str]:
         return [self.credentials.get("database", "dev")] 
@@ -52,19 +122,140 @@ class RedshiftProvider(DataProvider):
         schema = self.credentials.get("schema", "public")
         return insp.get_table_names(schema=schema)
 
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         schema = self.credentials.get("schema", "public")
-        q = f'SELECT * FROM "{schema}"."{table_name}"'
+        projection = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        q = f'SELECT {projection} FROM "{schema}"."{table_name}"'
         if limit and limit > 0:
             q += f" LIMIT {int(limit)}"
+        with self._stream_connect(STREAM_BUFFER_ROWS) as conn:
+            chunks = pd.read_sql_query(q, conn, chunksize=STREAM_BUFFER_ROWS, dtype_backend="pyarrow")
+            return pd.concat(chunks, ignore_index=True)
+
+    def _stream_connect(self, buffer_rows: int):
+        # server-side cursor: rows are fetched in batches instead of buffering the whole result client-side
+        return self.engine.connect().execution_options(stream_results=True, max_row_buffer=buffer_rows)
+
+    def read_table_iter(self, table_name: str, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+        schema = self.credentials.get("schema", "public")
+        q = f'SELECT * FROM "{schema}"."{table_name}"'
+        with self._stream_connect(chunk_size) as conn:
+            for chunk in pd.read_sql_query(q, conn, chunksize=chunk_size):
+                yield chunk
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        schema = self.credentials.get("schema", "public")
         with self.engine.connect() as conn:
-            return pd.read_sql_query(q, conn)
+            return int(conn.execute(text(f'SELECT COUNT(*) FROM "{schema}"."{table_name}"')).scalar() or 0)
+
+    def quality_stats(self, table_name: str) -> Optional[Dict]:
+        schema = self.credentials.get("schema", "public")
+        cols = inspect(self.engine).get_columns(table_name, schema=schema)
+        full = f'"{schema}"."{table_name}"'
+        exprs = [
+            "COUNT(*) AS n",
+            f"(SELECT COUNT(*) FROM (SELECT DISTINCT * FROM {full}) d) AS n_distinct",
+        ]
+        names = [c["name"] for c in cols]
+        for i, name in enumerate(names):
+            exprs.append(f'SUM(CASE WHEN "{name}" IS NULL THEN 1 ELSE 0 END) AS null_{i}')
+        text_cols = [c["name"] for c in cols if isinstance(c["type"], String)]
+        if text_cols:
+            # '.' has no special meaning in LIKE, so this matches a literal '...' suffix
+            cases = " + ".join(f'CASE WHEN "{name}" LIKE \'%...\' THEN 1 ELSE 0 END' for name in text_cols)
+            exprs.append(f"SUM({cases}) AS trunc")
+        with self.engine.connect() as conn:
+            row = conn.execute(text(f"SELECT {', '.join(exprs)} FROM {full}")).mappings().one()
+        n = int(row["n"] or 0)
+        return {
+            "rows": n,
+            "columns": names,
+            "duplicates": n - int(row["n_distinct"] or 0),
+            "nulls_by_column": {name: int(row[f"null_{i}"] or 0) for i, name in enumerate(names)},
+            "truncated_like": int(row["trunc"] or 0) if text_cols else 0,
+        }
 
     def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
         schema = self.credentials.get("schema", "public")
-        df.to_sql(table_name, self.engine, if_exists=if_exists, index=False, schema=schema)
+        can_copy = self.credentials.get("s3_staging_bucket") and self.credentials.get("iam_role")
+        # create (or replace) the table from the frame's schema, then bulk load the rows
+        df.head(0).to_sql(table_name, self.engine, if_exists=if_exists, index=False, schema=schema)
+        if df.empty:
+            return 0
+        if if_exists == "replace":
+            self._columns.pop(table_name, None)
+        if can_copy and len(df) > COPY_MIN_ROWS:
+            try:
+                self._copy_from_s3(schema, table_name, df)
+                return len(df)
+            except Exception:
+                # staging bucket unreachable (e.g. no AWS credentials) or COPY rejected the file;
+                # COPY is transactional, so nothing was loaded and the batched INSERT can take over
+                pass
+        self._insert_values(schema, table_name, df)
         return len(df)
 
+    def _table_columns(self, schema: str, table_name: str) -> Dict:
+        with self._lock:
+            if table_name not in self._columns:
+                cols = inspect(self.engine).get_columns(table_name, schema=schema)
+                self._columns[table_name] = {c["name"]: c["type"] for c in cols}
+            return self._columns[table_name]
+
+    def _s3_client(self):
+        import boto3
+
+        with self._lock:
+            if self._s3 is None:
+                self._s3 = boto3.client(
+                    "s3",
+                    aws_access_key_id=self.credentials.get("aws_access_key_id"),
+                    aws_secret_access_key=self.credentials.get("aws_secret_access_key"),
+                    aws_session_token=self.credentials.get("aws_session_token"),
+                    region_name=self.credentials.get("region"),
+                )
+            return self._s3
+
+    def _insert_values(self, schema: str, table_name: str, df: pd.DataFrame) -> None:
+        from psycopg2.extras import execute_values
+
+        cols = ", ".join(f'"{c}"' for c in df.columns)
+        # object cells give psycopg2 plain Python values, and missing values become NULL instead of NaN
+        rows = list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+        raw = self.engine.raw_connection()
+        try:
+            cur = raw.cursor()
+            execute_values(cur, f'INSERT INTO "{schema}"."{table_name}" ({cols}) VALUES %s', rows, page_size=1000)
+            cur.close()
+            raw.commit()
+        finally:
+            raw.close()
+
+    def _copy_from_s3(self, schema: str, table_name: str, df: pd.DataFrame) -> None:
+        bucket = self.credentials.get("s3_staging_bucket")
+        prefix = (self.credentials.get("s3_staging_prefix") or "redshift_staging").strip("/")
+        key = f"{prefix}/{table_name}/{uuid.uuid4().hex}.parquet"
+        iam_role = self.credentials.get("iam_role")
+        s3 = self._s3_client()
+        bio = BytesIO()
+        _coerce_to_columns(df, self._table_columns(schema, table_name)).to_parquet(
+            bio, index=False, compression="snappy"
+        )
+        s3.put_object(Bucket=bucket, Key=key, Body=bio.getvalue())
+        try:
+            source = f"s3://{bucket}/{key}"
+            q = (
+                f'COPY "{schema}"."{table_name}" '
+                f"FROM {_sql_literal(source)} IAM_ROLE {_sql_literal(iam_role)} FORMAT AS PARQUET"
+            )
+            # sent as-is: through text() the colons of the role ARN would be parsed as bind parameters
+            with self.engine.begin() as conn:
+                conn.exec_driver_sql(q)
+        finally:
+            s3.delete_object(Bucket=bucket, Key=key)
+
     def delete_rows(self, table_name: str, where_clause: Optional[str] = None) -> int:
         schema = self.credentials.get("schema", "public")
         if where_clause and where_clause.strip():
@@ -75,12 +266,28 @@ class RedshiftProvider(DataProvider):
             res = conn.execute(q)
             return res.rowcount if res.rowcount is not None else 0
 
+    def deduplicate(self, table_name: str) -> int:
+        schema = self.credentials.get("schema", "public")
+        orig = f'"{schema}"."{table_name}"'
+        dedup = f'"{schema}"."{table_name}__dedup"'
+        with self.engine.begin() as conn:
+            conn.execute(text(f"CREATE TABLE {dedup} AS SELECT DISTINCT * FROM {orig}"))
+            removed = conn.execute(
+                text(f"SELECT (SELECT COUNT(*) FROM {orig}) - (SELECT COUNT(*) FROM {dedup})")
+            ).scalar() or 0
+            if removed:
+                conn.execute(text(f"DROP TABLE {orig}"))
+                conn.execute(text(f'ALTER TABLE {dedup} RENAME TO "{table_name}"'))
+            else:
+                conn.execute(text(f"DROP TABLE {dedup}"))
+        return int(removed)
+
     def delete_table(self, table_name: str) -> None:
         schema = self.credentials.get("schema", "public")
         with self.engine.begin() as conn:
             conn.execute(text(f'DROP TABLE IF EXISTS "{schema}"."{table_name}"'))
+        self._columns.pop(table_name, None)
 
     def close(self) -> None:
-        if self.engine:
-            self.engine.dispose()
+        # the engine is shared through _ENGINE_CACHE, so its pool is left open for other providers
         self._connected = False
\ No newline at end of file
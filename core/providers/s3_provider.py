@@ -1,29 +1,265 @@
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from uuid import uuid4
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs as pafs
 import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
-from io import BytesIO
+from io import BufferedReader, BytesIO, RawIOBase
+import re
+import threading
+import time
 from .base import DataProvider
 
 
+# Downloads are split into byte ranges fetched in parallel; both can be overridden through the credentials
+RANGE_CHUNK_SIZE = 16 * 1024 * 1024
+RANGE_CONCURRENCY = 8
+# Read buffer for Parquet column chunks fetched through pyarrow's S3 filesystem
+PARQUET_BUFFER_SIZE = 8 * 1024 * 1024
+# A Parquet table is the object at its key plus the files appended under "<key>/part-<time_ns>-<uuid>.parquet",
+# read back in name (= append) order
+PART_MARKER = "/part-"
+# CSV is parsed by pyarrow in blocks of this size, one block per worker thread
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+# Limited reads (previews) fetch and parse CSV in small sequential pieces and stop early
+PREVIEW_BLOCK_SIZE = 1024 * 1024
+
+# One boto3 session and S3 client per credential set, shared by every provider instance.
+# The pool is sized for the ranged-GET threads; the default of 10 would serialize them.
+CLIENT_CONFIG = Config(
+    signature_version="s3v4",
+    max_pool_connections=50,
+    retries={"mode": "adaptive", "max_attempts": 5},
+)
+_SESSION_CACHE: Dict[Tuple, boto3.session.Session] = {}
+_CLIENT_CACHE: Dict[Tuple, object] = {}
+_CACHE_LOCK = threading.Lock()
+
+# Bucket listings are reused for this long, and dropped whenever this app writes or deletes a table
+LIST_TTL_SECONDS = 30
+# Rows per record batch handed to the Parquet writer when streaming an upload
+WRITE_BATCH_ROWS = 64_000
+
+# A single `column OP literal` term of a delete filter
+_TERM_RE = re.compile(
+    r"""^\s*`?(\w+)`?\s*(==|=|!=|<>|>=|<=|>|<)\s*('[^']*'|"[^"]*"|-?\d+(?:\.\d+)?|true|false)\s*$""",
+    re.IGNORECASE,
+)
+_COMPARISONS = {
+    "==": lambda f, v: f == v,
+    "=": lambda f, v: f == v,
+    "!=": lambda f, v: f != v,
+    "<>": lambda f, v: f != v,
+    ">=": lambda f, v: f >= v,
+    "<=": lambda f, v: f <= v,
+    ">": lambda f, v: f > v,
+    "<": lambda f, v: f < v,
+}
+_SELECT_OPS = {"==": "=", "!=": "<>"}
+
+
+def _parse_literal(token: str):
+    if token[0] in "'\"":
+        return token[1:-1]
+    if token.lower() in ("true", "false"):
+        return token.lower() == "true"
+    return float(token) if "." in token else int(token)
+
+
+def _parse_where(where_clause: str) -> Optional[List[List[Tuple[str, str, object]]]]:
+    # Terms joined by AND/OR (AND binds tighter, no parentheses), as OR-groups of (column, op, value);
+    # None for anything else, so the caller can fall back to pandas' query syntax
+    groups = []
+    for group in re.split(r"\s+or\s+", where_clause.strip(), flags=re.IGNORECASE):
+        terms = []
+        for term in re.split(r"\s+and\s+", group, flags=re.IGNORECASE):
+            m = _TERM_RE.match(term)
+            if not m:
+                return None
+            col, op, value = m.groups()
+            terms.append((col, op, _parse_literal(value)))
+        groups.append(terms)
+    return groups
+
+
+def _where_to_expression(where_clause: str) -> Optional[ds.Expression]:
+    groups = _parse_where(where_clause)
+    if groups is None:
+        return None
+    disjuncts = []
+    for terms in groups:
+        expr = None
+        for col, op, value in terms:
+            term = _COMPARISONS[op](pc.field(col), value)
+            expr = term if expr is None else expr & term
+        disjuncts.append(expr)
+    expr = disjuncts[0]
+    for d in disjuncts[1:]:
+        expr = expr | d
+    return expr
+
+
+def _where_to_select_sql(where_clause: str) -> Optional[str]:
+    # Same grammar rendered for S3 Select, where every CSV field is text: numbers are compared after a CAST
+    groups = _parse_where(where_clause)
+    if groups is None:
+        return None
+    disjuncts = []
+    for terms in groups:
+        conjuncts = []
+        for col, op, value in terms:
+            if isinstance(value, bool):
+                return None
+            ref = f's."{col}"'
+            if isinstance(value, str):
+                literal = "'" + value.replace("'", "''") + "'"
+            else:
+                ref, literal = f"CAST({ref} AS FLOAT)", repr(value)
+            conjuncts.append(f"{ref} {_SELECT_OPS.get(op, op)} {literal}")
+        disjuncts.append("(" + " AND ".join(conjuncts) + ")")
+    return " OR ".join(disjuncts)
+
+
+def _get_client(access_key, secret_key, session_token, region):
+    cache_key = (access_key, secret_key, session_token, region)
+    # boto3 sessions are not thread-safe, so clients are created under the lock; clients themselves are
+    # thread-safe and are shared freely once built
+    with _CACHE_LOCK:
+        client = _CLIENT_CACHE.get(cache_key)
+        if client is None:
+            session = _SESSION_CACHE.get(cache_key)
+            if session is None:
+                session = boto3.session.Session(
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    aws_session_token=session_token,
+                    region_name=region,
+                )
+                _SESSION_CACHE[cache_key] = session
+            client = session.client("s3", config=CLIENT_CONFIG)
+            _CLIENT_CACHE[cache_key] = client
+        return client
+
+
+def _csv_table(df: pd.DataFrame) -> pa.Table:
+    # Arrow needs one type per column, but object columns can mix them (SQLite's dynamic typing yields
+    # [1, "abc", 2.5]); CSV stores text anyway, so such columns are written as their string form
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        mixed = {c: "string" for c, dtype in df.dtypes.items() if dtype == object}
+        return pa.Table.from_pandas(df.astype(mixed), preserve_index=False)
+
+
+@lru_cache(maxsize=32)
+def _list_level(client, bucket: str, prefix: str, _window: int) -> Tuple[str, ...]:
+    # One directory level of the bucket; `_window` changes every LIST_TTL_SECONDS so entries expire.
+    # With Delimiter the "<key>/part-*" files of a Parquet table come back as a single prefix instead of
+    # one key each. Other directories are listed as "<dir>/" without their contents, so the user can
+    # point the prefix at them.
+    paginator = client.get_paginator("list_objects_v2")
+    # the service stops after 200 entries instead of returning full 1000-entry pages
+    pages = paginator.paginate(
+        Bucket=bucket, Prefix=prefix, Delimiter="/", PaginationConfig={"MaxItems": 200, "PageSize": 200}
+    )
+    tables = []
+    for page in pages:
+        tables.extend(obj["Key"] for obj in page.get("Contents", []))
+        for p in page.get("CommonPrefixes", []):
+            # appended Parquet parts are listed as their table
+            tables.append(p["Prefix"][:-1] if p["Prefix"].endswith(".parquet/") else p["Prefix"])
+    return tuple(dict.fromkeys(tables))
+
+
+class _RangePrefetchReader(RawIOBase):
+    # Sequential view of an S3 object that keeps the next byte ranges downloading in the background,
+    # so the parser can start on the first range while later ones are still in flight.
+
+    def __init__(self, client, bucket: str, key: str, chunk_size: int, concurrency: int):
+        super().__init__()
+        head = client.head_object(Bucket=bucket, Key=key)
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        # IfMatch makes every range come from the same object version
+        self._etag = head["ETag"]
+        self._size = head["ContentLength"]
+        self._chunk = chunk_size
+        self._pool = ThreadPoolExecutor(max_workers=concurrency)
+        self._pending = deque()
+        self._next_start = 0
+        self._buf = memoryview(b"")
+        for _ in range(concurrency):
+            self._schedule()
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        obj = self._client.get_object(
+            Bucket=self._bucket, Key=self._key, Range=f"bytes={start}-{end}", IfMatch=self._etag
+        )
+        return obj["Body"].read()
+
+    def _schedule(self) -> None:
+        if self._next_start < self._size:
+            end = min(self._next_start + self._chunk, self._size) - 1
+            self._pending.append(self._pool.submit(self._fetch, self._next_start, end))
+            self._next_start = end + 1
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._buf:
+            if not self._pending:
+                return 0
+            self._buf = memoryview(self._pending.popleft().result())
+            self._schedule()
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            for f in self._pending:
+                f.cancel()
+            self._pool.shutdown(wait=True)
+        super().close()
+
+
 class S3Provider(DataProvider):
     def __init__(self, credentials: Dict):
         super().__init__(credentials)
         self.client = None
+        self.fs: Optional[pafs.S3FileSystem] = None
 
     def connect(self) -> None:
         access_key = self.credentials.get("aws_access_key_id")
         secret_key = self.credentials.get("aws_secret_access_key")
         region = self.credentials.get("region")
         session_token = self.credentials.get("aws_session_token")
-        self.client = boto3.client(
-            "s3",
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            aws_session_token=session_token,
-            region_name=region,
-            config=Config(signature_version="s3v4"),
+        self.client = _get_client(access_key, secret_key, session_token, region)
+        bucket = self.credentials.get("bucket")
+        fs_region = region
+        if not fs_region and bucket:
+            # boto3 follows S3's region redirects but pyarrow does not, and credential files rarely set a region
+            try:
+                fs_region = pafs.resolve_s3_region(bucket)
+            except OSError:
+                fs_region = None
+        self.fs = pafs.S3FileSystem(
+            access_key=access_key,
+            secret_key=secret_key,
+            session_token=session_token,
+            region=fs_region,
         )
         # smoke test
         self.client.list_buckets()
@@ -70,83 +306,276 @@ class S3Provider(DataProvider):
         prefix = self.credentials.get("prefix", "")
         if not bucket:
             return []
-        keys = []
+        if prefix and not prefix.endswith("/"):
+            # a prefix names a directory; without the slash S3 would only return that directory itself
+            prefix += "/"
+        return list(_list_level(self.client, bucket, prefix, int(time.monotonic() // LIST_TTL_SECONDS)))
+
+    def _open_ranged(
+        self, bucket: str, key: str, chunk: Optional[int] = None, workers: Optional[int] = None
+    ) -> BufferedReader:
+        chunk = chunk or int(self.credentials.get("range_chunk_size") or RANGE_CHUNK_SIZE)
+        workers = workers or int(self.credentials.get("range_concurrency") or RANGE_CONCURRENCY)
+        return BufferedReader(_RangePrefetchReader(self.client, bucket, key, chunk, workers), buffer_size=chunk)
+
+    def _part_keys(self, bucket: str, key: str) -> List[str]:
+        parts = []
         paginator = self.client.get_paginator("list_objects_v2")
-        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-            for obj in page.get("Contents", []):
-                keys.append(obj["Key"])
-            if len(keys) > 200:
-                break
-        return keys
-
-    def _read_object_df(self, bucket: str, key: str) -> pd.DataFrame:
-        obj = self.client.get_object(Bucket=bucket, Key=key)
-        body = obj["Body"].read()
-        bio = BytesIO(body)
+        for page in paginator.paginate(Bucket=bucket, Prefix=key + PART_MARKER):
+            parts.extend(obj["Key"] for obj in page.get("Contents", []))
+        return sorted(parts)
+
+    def _parquet_dataset(self, bucket: str, key: str) -> ds.Dataset:
+        paths = [f"{bucket}/{k}" for k in self._part_keys(bucket, key)]
+        if self.fs.get_file_info(f"{bucket}/{key}").type == pafs.FileType.File:
+            paths.insert(0, f"{bucket}/{key}")
+        if not paths:
+            raise FileNotFoundError(f"s3://{bucket}/{key}")
+        # pre_buffer lets Arrow coalesce and fetch column chunks concurrently instead of one read per chunk
+        fmt = ds.ParquetFileFormat(
+            default_fragment_scan_options=ds.ParquetFragmentScanOptions(
+                pre_buffer=True, use_buffered_stream=True, buffer_size=PARQUET_BUFFER_SIZE
+            )
+        )
+        dataset = ds.dataset(paths, format=fmt, filesystem=self.fs)
+        if len(paths) > 1:
+            # Each appended part carries the types its own chunk inferred (an int column with NULLs becomes
+            # double, an all-None column becomes null), while the dataset would take the first file's schema.
+            # A permissively unified schema lets every part be cast to it on read.
+            schema = pa.unify_schemas(
+                [fragment.physical_schema for fragment in dataset.get_fragments()], promote_options="permissive"
+            )
+            dataset = ds.dataset(paths, schema=schema.remove_metadata(), format=fmt, filesystem=self.fs)
+        return dataset
+
+    def _delete_parts(self, bucket: str, key: str) -> None:
+        parts = self._part_keys(bucket, key)
+        for i in range(0, len(parts), 1000):
+            batch = [{"Key": k} for k in parts[i : i + 1000]]
+            self.client.delete_objects(Bucket=bucket, Delete={"Objects": batch, "Quiet": True})
+
+    def _read_object_df(
+        self, bucket: str, key: str, columns: Optional[List[str]] = None, limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        return self._read_object_table(bucket, key, columns, limit).to_pandas(self_destruct=True, split_blocks=True)
+
+    def _read_object_table(
+        self, bucket: str, key: str, columns: Optional[List[str]] = None, limit: Optional[int] = None
+    ) -> pa.Table:
         if key.lower().endswith(".parquet"):
-            return pd.read_parquet(bio)
+            dataset = self._parquet_dataset(bucket, key)
+            if limit:
+                # decode only the first row groups instead of the whole table
+                return dataset.head(limit, columns=columns)
+            return dataset.to_table(columns=columns, use_threads=True)
+        convert_options = pacsv.ConvertOptions(include_columns=columns) if columns else None
+        if limit:
+            # one small range at a time, stopping as soon as enough rows are parsed
+            with self._open_ranged(bucket, key, chunk=PREVIEW_BLOCK_SIZE, workers=1) as src:
+                reader = pacsv.open_csv(
+                    src,
+                    read_options=pacsv.ReadOptions(block_size=PREVIEW_BLOCK_SIZE),
+                    convert_options=convert_options,
+                )
+                batches, rows = [], 0
+                for batch in reader:
+                    batches.append(batch)
+                    rows += batch.num_rows
+                    if rows >= limit:
+                        break
+                return pa.Table.from_batches(batches, schema=reader.schema).slice(0, limit)
+        # parsing starts as soon as the first range arrives instead of after the whole download
+        with self._open_ranged(bucket, key) as src:
+            return pacsv.read_csv(
+                src,
+                read_options=pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE),
+                convert_options=convert_options,
+            )
+
+    def _upload_df(self, bucket: str, key: str, df: pd.DataFrame) -> None:
+        if key.lower().endswith(".parquet"):
+            table = pa.Table.from_pandas(df, preserve_index=False)
         else:
-            return pd.read_csv(bio)
+            table = _csv_table(df)
+        self._upload_table(bucket, key, table)
+
+    def _upload_table(self, bucket: str, key: str, table: pa.Table) -> None:
+        # pyarrow's S3 output stream sends multipart parts in the background as they fill up,
+        # so only a few parts are buffered instead of the whole encoded object
+        with self.fs.open_output_stream(f"{bucket}/{key}") as sink:
+            if key.lower().endswith(".parquet"):
+                with pq.ParquetWriter(sink, table.schema, compression="zstd") as writer:
+                    for batch in table.to_batches(max_chunksize=WRITE_BATCH_ROWS):
+                        writer.write_batch(batch)
+            else:
+                pacsv.write_csv(table, sink)
 
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         bucket = self.credentials.get("bucket")
         key = table_name or self.credentials.get("key")
         if not bucket or not key:
             raise ValueError("bucket e key são obrigatórios para leitura S3")
-        df = self._read_object_df(bucket, key)
-        if limit and limit > 0:
-            return df.iloc[: int(limit)]
-        return df
+        return self._read_object_df(bucket, key, columns, int(limit) if limit and limit > 0 else None)
 
     def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
         bucket = self.credentials.get("bucket")
         key = table_name or self.credentials.get("key")
         if not bucket or not key:
             raise ValueError("bucket e key são obrigatórios para escrita S3")
-        # For S3, we write full object; append will overwrite by concatenating
-        existing = pd.DataFrame()
+        _list_level.cache_clear()
+        if key.lower().endswith(".parquet"):
+            if if_exists == "append":
+                # new rows go to a sibling part file, so appends never read or rewrite existing data
+                # the timestamp makes the sorted part listing follow write order; the uuid keeps names unique
+                part = f"{bucket}/{key}{PART_MARKER}{time.time_ns():020d}-{uuid4().hex}.parquet"
+                pq.write_table(
+                    pa.Table.from_pandas(df, preserve_index=False), part, filesystem=self.fs, compression="zstd"
+                )
+            else:
+                self._upload_df(bucket, key, df)
+                self._delete_parts(bucket, key)
+            return len(df)
+        # For CSV, we write full object; append rewrites it with the new rows added at the end
+        existing = None
         if if_exists == "append":
             try:
-                existing = self._read_object_df(bucket, key)
-            except ClientError:
-                existing = pd.DataFrame()
-        out_df = pd.concat([existing, df], ignore_index=True) if not existing.empty else df
-        bio = BytesIO()
-        if key.lower().endswith(".parquet"):
-            out_df.to_parquet(bio, index=False)
+                # the first rows are enough to learn the header
+                existing = self._read_object_table(bucket, key, limit=1)
+            except (ClientError, FileNotFoundError):
+                existing = None
+            except pa.ArrowInvalid as exc:
+                # a zero-byte object holds no rows; any other parse error must not be mistaken for one
+                if "Empty CSV file" not in str(exc):
+                    raise
+                existing = None
+        if existing is None or existing.num_rows == 0:
+            self._upload_df(bucket, key, df)
+        elif set(existing.column_names) == set(df.columns):
+            self._append_csv(bucket, key, df[existing.column_names])
         else:
-            out_df.to_csv(bio, index=False)
-        bio.seek(0)
-        self.client.put_object(Bucket=bucket, Key=key, Body=bio.read())
+            # the column sets differ, so the rows have to be aligned in pandas
+            out_df = pd.concat([self._read_object_df(bucket, key), df], ignore_index=True)
+            self._upload_df(bucket, key, out_df)
         return len(df)
 
+    def _append_csv(self, bucket: str, key: str, df: pd.DataFrame) -> None:
+        # The existing bytes are copied through unparsed and the new rows are encoded after them, so memory
+        # stays at one range instead of both tables. The result goes to a temporary key and is then copied
+        # over the original server-side, so a failure midway never leaves a truncated table.
+        tmp = f"{key}.tmp-{uuid4().hex}"
+        try:
+            with self.fs.open_output_stream(f"{bucket}/{tmp}") as sink:
+                last = b"\n"
+                with self._open_ranged(bucket, key) as src:
+                    for chunk in iter(lambda: src.read(CSV_BLOCK_SIZE), b""):
+                        sink.write(chunk)
+                        last = chunk[-1:]
+                if last != b"\n":
+                    sink.write(b"\n")
+                pacsv.write_csv(
+                    _csv_table(df),
+                    sink,
+                    write_options=pacsv.WriteOptions(include_header=False),
+                )
+            self.client.copy({"Bucket": bucket, "Key": tmp}, bucket, key)
+        finally:
+            self.client.delete_object(Bucket=bucket, Key=tmp)
+
     def delete_rows(self, table_name: str, where_clause: Optional[str] = None) -> int:
-        # naive: load object, filter with pandas.query, rewrite
         bucket = self.credentials.get("bucket")
         key = table_name or self.credentials.get("key")
         if not bucket or not key:
             return 0
-        df = self._read_object_df(bucket, key)
-        if df.empty:
-            return 0
-        before = len(df)
-        if where_clause and where_clause.strip():
-            try:
-                mask = df.query(where_clause).index
-                df2 = df.drop(index=mask)
-            except Exception:
-                # if query fails, do not modify
-                df2 = df
+        is_parquet = key.lower().endswith(".parquet")
+        if not is_parquet and where_clause and self.credentials.get("use_s3_select"):
+            removed = self._select_delete(bucket, key, where_clause)
+            if removed is not None:
+                return removed
+        if is_parquet:
+            dataset = self._parquet_dataset(bucket, key)
         else:
-            df2 = pd.DataFrame(columns=df.columns)
-        bio = BytesIO()
-        if key.lower().endswith(".parquet"):
-            df2.to_parquet(bio, index=False)
+            # CSV has no statistics to prune with; it is parsed into Arrow once and filtered there
+            dataset = ds.dataset(self._read_object_table(bucket, key))
+        if where_clause and where_clause.strip():
+            survivors = self._surviving_rows(dataset, where_clause)
+            if survivors is None:
+                return 0
         else:
-            df2.to_csv(bio, index=False)
-        bio.seek(0)
-        self.client.put_object(Bucket=bucket, Key=key, Body=bio.read())
-        return before - len(df2)
+            survivors = dataset.schema.empty_table()
+        removed = dataset.count_rows() - survivors.num_rows
+        if removed:
+            # the Arrow table keeps the stored schema, so the rewrite does no type inference
+            self._upload_table(bucket, key, survivors)
+            if is_parquet:
+                # the rewritten object now holds every surviving row, parts included
+                self._delete_parts(bucket, key)
+        return removed
+
+    def _select(self, bucket: str, key: str, expression: str) -> Iterator[bytes]:
+        # Result of an S3 Select query on a CSV object, filtered by S3 and streamed back as header-less CSV
+        resp = self.client.select_object_content(
+            Bucket=bucket,
+            Key=key,
+            ExpressionType="SQL",
+            Expression=expression,
+            InputSerialization={"CSV": {"FileHeaderInfo": "USE"}, "CompressionType": "NONE"},
+            OutputSerialization={"CSV": {}},
+        )
+        for event in resp["Payload"]:
+            if "Records" in event:
+                yield event["Records"]["Payload"]
+
+    def _select_delete(self, bucket: str, key: str, where_clause: str) -> Optional[int]:
+        # CSV deletes filtered server-side: counting matches downloads nothing, and the rewrite
+        # receives only the surviving rows. None when S3 Select cannot evaluate the clause.
+        cond = _where_to_select_sql(where_clause)
+        if cond is None:
+            return None
+        try:
+            counted = b"".join(self._select(bucket, key, f"SELECT COUNT(*) FROM S3Object s WHERE {cond}"))
+            removed = int(counted.strip() or 0)
+            if not removed:
+                return 0
+            buf = BytesIO()
+            pacsv.write_csv(self._read_object_table(bucket, key, limit=1).schema.empty_table(), buf)
+            # buffered rather than streamed to the key, so a failed query cannot leave a truncated object
+            for chunk in self._select(bucket, key, f"SELECT * FROM S3Object s WHERE NOT ({cond})"):
+                buf.write(chunk)
+        except ClientError:
+            # e.g. a field that does not CAST to a number, or S3 Select not enabled for the account
+            return None
+        buf.seek(0)
+        self.client.upload_fileobj(buf, bucket, key)
+        return removed
+
+    def _surviving_rows(self, dataset: ds.Dataset, where_clause: str) -> Optional[pa.Table]:
+        # None when no row matches (or the clause is invalid), so the object is left untouched
+        expr = _where_to_expression(where_clause)
+        if expr is not None:
+            try:
+                # row groups whose statistics exclude the filter are skipped without being decoded
+                if not dataset.count_rows(filter=expr):
+                    return None
+                # like SQL DELETE, rows where the filter is null are kept
+                return dataset.to_table(filter=~expr | expr.is_null(), use_threads=True)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                # e.g. comparing a string column with a number; let pandas decide
+                pass
+        table = dataset.to_table(use_threads=True)
+        try:
+            # other clauses keep pandas' query syntax; only the boolean mask goes back to Arrow
+            matched = table.to_pandas().eval(where_clause)
+        except Exception:
+            return None
+        # like df.query, anything but a boolean mask (e.g. "a + 1") is rejected rather than coerced
+        if not isinstance(matched, pd.Series) or not pd.api.types.is_bool_dtype(matched.dtype):
+            return None
+        keep = ~matched.fillna(False).astype(bool).to_numpy()
+        if keep.all():
+            return None
+        return table.filter(pa.array(keep))
 
     def delete_table(self, table_name: str) -> None:
         bucket = self.credentials.get("bucket")
@@ -154,6 +583,9 @@ class S3Provider(DataProvider):
         if not bucket or not key:
             return
         self.client.delete_object(Bucket=bucket, Key=key)
+        if key.lower().endswith(".parquet"):
+            self._delete_parts(bucket, key)
+        _list_level.cache_clear()
 
     def close(self) -> None:
         self._connected = False
\ No newline at end of file
@@ -1,9 +1,33 @@
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 import pandas as pd
+import pyarrow as pa
 import snowflake.connector
 from snowflake.connector.pandas_tools import write_pandas
 from .base import DataProvider
 
+# write_pandas stages the frame as snappy Parquet files of this many rows, uploaded by this many threads
+WRITE_CHUNK_ROWS = 500_000
+WRITE_PARALLEL = 8
+
+
+def _quote(name: str) -> str:
+    # Quoted form for IDENTIFIER(%s) bindings, so names keep their case like "..." in SQL text
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _snowflake_type(dtype) -> str:
+    # Column types auto_create_table would infer from the staged Parquet for these pandas dtypes
+    kind = getattr(dtype, "kind", "O")
+    if kind == "b":
+        return "BOOLEAN"
+    if kind in "iu":
+        return "NUMBER(38, 0)"
+    if kind == "f":
+        return "FLOAT"
+    if kind == "M":
+        return "TIMESTAMP_TZ" if getattr(dtype, "tz", None) is not None else "TIMESTAMP_NTZ"
+    return "VARCHAR"
+
 
 class SnowflakeProvider(DataProvider):
     def __init__(self, credentials: Dict):
@@ -64,34 +88,88 @@ class SnowflakeProvider(DataProvider):
         cur.close()
         return tables
 
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         cur = self.conn.cursor()
-        q = f'SELECT * FROM "{table_name}"'
+        # identifiers and the limit are passed as parameters instead of formatted into the SQL; the connector's
+        # default pyformat style still interpolates them client-side, so this is about quoting, not plan reuse
+        projection = ", ".join("IDENTIFIER(%s)" for _ in columns) if columns else "*"
+        q = f"SELECT {projection} FROM IDENTIFIER(%s)"
+        params = [_quote(c) for c in columns or []] + [_quote(table_name)]
         if limit and limit > 0:
-            q += f" LIMIT {int(limit)}"
-        cur.execute(q)
-        df = cur.fetch_pandas_all()
-        cur.close()
-        return df
+            q += " LIMIT %s"
+            params.append(int(limit))
+        cur.execute(q, params)
+        try:
+            # result chunks arrive as Arrow tables (downloaded in parallel by the connector) and are
+            # converted to pandas once, releasing Arrow buffers as each column is converted
+            tables = list(cur.fetch_arrow_batches())
+            if not tables:
+                return pd.DataFrame(columns=[d[0] for d in cur.description])
+            return pa.concat_tables(tables).to_pandas(self_destruct=True, split_blocks=True, use_threads=True)
+        finally:
+            cur.close()
 
-    def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
+    def read_table_iter(self, table_name: str, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+        cur = self.conn.cursor()
+        try:
+            cur.execute("SELECT * FROM IDENTIFIER(%s)", (_quote(table_name),))
+            empty = True
+            for table in cur.fetch_arrow_batches():
+                for batch in table.to_batches(max_chunksize=chunk_size):
+                    empty = False
+                    yield batch.to_pandas()
+            if empty:
+                # keep the column names so the destination table can still be created
+                yield pd.DataFrame(columns=[d[0] for d in cur.description])
+        finally:
+            cur.close()
+
+    def count_rows(self, table_name: str) -> Optional[int]:
         cur = self.conn.cursor()
-        if if_exists == "replace":
-            cur.execute(f'DROP TABLE IF EXISTS "{table_name}"')
-        # Ensure table exists; create based on dataframe columns as TEXT
-        cols = ", ".join([f'"{c}" STRING' for c in df.columns])
-        cur.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({cols})')
+        cur.execute("SELECT COUNT(*) FROM IDENTIFIER(%s)", (_quote(table_name),))
+        n = cur.fetchone()[0]
         cur.close()
-        success, nchunks, nrows, _ = write_pandas(self.conn, df, table_name, quote_identifiers=True)
+        return int(n)
+
+    def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
+        if df.empty:
+            # write_pandas stages no file for an empty frame, leaving auto_create_table nothing to infer from
+            self._create_table(table_name, df, replace=if_exists == "replace")
+            return 0
+        # the table is created from the staged Parquet schema, so columns keep their real types
+        success, nchunks, nrows, _ = write_pandas(
+            self.conn,
+            df,
+            table_name,
+            quote_identifiers=True,
+            parallel=WRITE_PARALLEL,
+            chunk_size=WRITE_CHUNK_ROWS,
+            compression="snappy",
+            use_logical_type=True,
+            auto_create_table=True,
+            overwrite=if_exists == "replace",
+        )
         return int(nrows)
 
+    def _create_table(self, table_name: str, df: pd.DataFrame, replace: bool) -> None:
+        cols = ", ".join(f"{_quote(str(c))} {_snowflake_type(dtype)}" for c, dtype in df.dtypes.items())
+        verb = "CREATE OR REPLACE TABLE" if replace else "CREATE TABLE IF NOT EXISTS"
+        cur = self.conn.cursor()
+        try:
+            cur.execute(f"{verb} IDENTIFIER(%s) ({cols})", (_quote(table_name),))
+        finally:
+            cur.close()
+
     def delete_rows(self, table_name: str, where_clause: Optional[str] = None) -> int:
         cur = self.conn.cursor()
+        # the filter is user-written SQL and stays as text (with % escaped for pyformat); the table name is bound
         if where_clause and where_clause.strip():
-            q = f'DELETE FROM "{table_name}" WHERE {where_clause}'
+            q = "DELETE FROM IDENTIFIER(%s) WHERE " + where_clause.replace("%", "%%")
         else:
-            q = f'DELETE FROM "{table_name}"'
-        res = cur.execute(q)
+            q = "DELETE FROM IDENTIFIER(%s)"
+        res = cur.execute(q, (_quote(table_name),))
         cur.close()
         try:
             return int(res.rowcount)
@@ -100,7 +178,7 @@ class SnowflakeProvider(DataProvider):
 
     def delete_table(self, table_name: str) -> None:
         cur = self.conn.cursor()
-        cur.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        cur.execute("DROP TABLE IF EXISTS IDENTIFIER(%s)", (_quote(table_name),))
         cur.close()
 
     def close(self) -> None:
@@ -1,10 +1,61 @@
 from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from pathlib import Path
 import sqlite3
+import threading
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
 from .base import DataProvider
 
+try:
+    import connectorx as cx
+except ImportError:  # listed in requirements; without it reads fall back to pandas' row-by-row fetch
+    cx = None
+
+
+def _quote_ident(name) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _bindable(v):
+    # Values sqlite3 binds natively pass through; the rest are normalized like the typed columns below
+    if v is None or isinstance(v, (int, float, str, bytes)):
+        return v
+    if isinstance(v, np.generic):
+        return _bindable(v.item())
+    if isinstance(v, Decimal):
+        return float(v)
+    if isinstance(v, (datetime, date)):
+        return v.isoformat(" ") if isinstance(v, datetime) else v.isoformat()
+    if isinstance(v, timedelta):
+        return pd.Timedelta(v).value
+    return str(v)
+
+
+def _bindable_rows(df: pd.DataFrame):
+    # sqlite3 cannot bind pandas' Timestamp/Timedelta, so they are stored the way pandas' SQLite writer
+    # stores them: timestamps as ISO text, timedeltas as integer nanoseconds. Object columns may also hold
+    # Decimals and other values sqlite3 rejects. Missing values become NULL.
+    values = df.astype(object).where(df.notna(), None)
+    for i, dtype in enumerate(df.dtypes):
+        # numpy, tz-aware and Arrow-backed datetime/duration dtypes all report kind "M"/"m"
+        kind = getattr(dtype, "kind", None)
+        col = df.iloc[:, i]
+        # built as object arrays so pandas does not turn the integers into floats around the NULLs
+        if kind == "M":
+            values.iloc[:, i] = np.array([None if pd.isna(v) else v.isoformat(" ") for v in col], dtype=object)
+        elif kind == "m":
+            values.iloc[:, i] = np.array([None if pd.isna(v) else v.value for v in col], dtype=object)
+        elif kind == "O":
+            values.iloc[:, i] = np.array([_bindable(v) for v in values.iloc[:, i]], dtype=object)
+    return values.itertuples(index=False, name=None)
+
+
+_LIST_TABLES_SQL = "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name"
+
 
 class SQLiteProvider(DataProvider):
     def __init__(self, credentials: Dict):
@@ -12,13 +63,26 @@ class SQLiteProvider(DataProvider):
         self.db_path = credentials.get("db_path")
         self.conn: Optional[sqlite3.Connection] = None
         self.engine = None
+        # table names are served from memory until this provider creates or drops a table
+        self._tables_cache: Optional[Dict[str, str]] = None
+        self._list_tables_stmt: Optional[sqlite3.Cursor] = None
+        self._tables_lock = threading.Lock()
 
     def connect(self) -> None:
         if not self.db_path:
             raise ValueError("db_path é obrigatório para SQLite")
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
-        self.engine = create_engine(f"sqlite:///{self.db_path}")
+        # shared across Streamlit reruns and the migration reader thread
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # bulk-load friendly settings: WAL with relaxed fsync, in-memory temp tables, 256 MB page cache
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-262144")
+        # SQLAlchemy reuses this same handle: no second file open, and the PRAGMAs above apply to it too
+        self.engine = create_engine("sqlite://", creator=lambda: self.conn, poolclass=StaticPool)
+        self._tables_cache = None
+        self._list_tables_stmt = self.conn.cursor()
         self._connected = True
 
     def test_connection(self) -> bool:
@@ -49,33 +113,80 @@ class SQLiteProvider(DataProvider):
         # Dataset concept is not applicable; return ["main"]
         return ["main"]
 
+    def _relations(self) -> Dict[str, str]:
+        # name -> "table" or "view"
+        with self._tables_lock:
+            if self._tables_cache is None:
+                self._list_tables_stmt.execute(_LIST_TABLES_SQL)
+                self._tables_cache = dict(self._list_tables_stmt.fetchall())
+            return self._tables_cache
+
     def list_tables(self, dataset: Optional[str] = None) -> List[str]:
-        cur = self.conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        return [row[0] for row in cur.fetchall()]
-
-    def read_table(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
-        q = f"SELECT * FROM {table_name}"
-        if limit and limit > 0:
-            q += f" LIMIT {int(limit)}"
+        return [name for name, kind in self._relations().items() if kind == "table"]
+
+    def _table_ident(self, table_name: str) -> str:
+        # Table names cannot be bound as parameters, so only existing tables and views are accepted and quoted
+        if table_name not in self._relations():
+            # the cache may predate a table created by another connection
+            self._tables_cache = None
+            if table_name not in self._relations():
+                raise ValueError(f"Tabela SQLite inexistente: {table_name}")
+        return _quote_ident(table_name)
+
+    def read_table(
+        self, table_name: str, limit: Optional[int] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        projection = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        q = f"SELECT {projection} FROM {self._table_ident(table_name)}"
+        limit = int(limit) if limit and limit > 0 else None
+        if cx is not None:
+            try:
+                # fetched into Arrow in native code, then handed to pandas without per-row Python objects;
+                # connectorx has no parameter binding, so the (integer) limit is inlined there
+                cx_q = f"{q} LIMIT {limit}" if limit else q
+                return cx.read_sql(f"sqlite://{Path(self.db_path).resolve()}", cx_q, return_type="pandas")
+            except Exception:
+                # connectorx rejects some of SQLite's dynamically typed columns; the pandas path accepts them
+                pass
+        if limit:
+            # bound, so every preview size reuses the same cached statement
+            return pd.read_sql_query(f"{q} LIMIT ?", self.conn, params=(limit,))
         return pd.read_sql_query(q, self.conn)
 
+    def count_rows(self, table_name: str) -> Optional[int]:
+        return int(self.conn.execute(f"SELECT COUNT(*) FROM {self._table_ident(table_name)}").fetchone()[0])
+
     def write_table(self, table_name: str, df: pd.DataFrame, if_exists: str = "append") -> int:
-        df.to_sql(table_name, self.engine, if_exists=if_exists, index=False)
+        # pandas only creates (or replaces) the table; rows go through one executemany transaction
+        df.head(0).to_sql(table_name, self.conn, if_exists=if_exists, index=False)
+        self._tables_cache = None
+        if df.empty:
+            return 0
+        cols = ", ".join(_quote_ident(c) for c in df.columns)
+        marks = ", ".join("?" for _ in df.columns)
+        rows = _bindable_rows(df)
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO {_quote_ident(table_name)} ({cols}) VALUES ({marks})", rows)
         return len(df)
 
     def delete_rows(self, table_name: str, where_clause: Optional[str] = None) -> int:
+        ident = self._table_ident(table_name)
         if where_clause and where_clause.strip():
-            q = text(f"DELETE FROM {table_name} WHERE {where_clause}")
+            q = text(f"DELETE FROM {ident} WHERE {where_clause}")
         else:
-            q = text(f"DELETE FROM {table_name}")
+            q = text(f"DELETE FROM {ident}")
         with self.engine.begin() as conn:
             res = conn.execute(q)
             return res.rowcount if res.rowcount is not None else 0
 
     def delete_table(self, table_name: str) -> None:
+        try:
+            ident = self._table_ident(table_name)
+        except ValueError:
+            return
         with self.engine.begin() as conn:
-            conn.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {ident}"))
+        self._tables_cache = None
 
     def close(self) -> None:
         try: